@@ -18,6 +18,13 @@ export interface AutotileMap {
   /** Set the resolved Cell at (x, y) */
   setCellAt(x: number, y: number, cell: Cell): void;
 
+  /**
+   * Optional bulk write: set many resolved Cells in one call.
+   * Lets implementations amortize per-write overhead (events, dirty
+   * tracking) over a whole brush stroke. Callers fall back to setCellAt.
+   */
+  setCells?(writes: Array<[number, number, Cell]>): void;
+
   /** Check if (x, y) is within bounds */
   inBounds(x: number, y: number): boolean;
 }
@@ -56,6 +63,14 @@ export class SimpleAutotileMap implements AutotileMap {
     this.cells[y * this.width + x] = cell;
   }
 
+  setCells(writes: Array<[number, number, Cell]>): void {
+    for (const [x, y, cell] of writes) {
+      if (this.inBounds(x, y)) {
+        this.cells[y * this.width + x] = cell;
+      }
+    }
+  }
+
   /** Convenience read-only shorthand for cellAt(x,y).tileId */
   tileIdAt(x: number, y: number): number {
     return this.cellAt(x, y).tileId;
@@ -28,7 +28,10 @@ export function computeColorDistances(wangSet: WangSet): ColorDistanceResult {
 
   // Find direct transitions from existing tiles
   for (const { wangId } of wangSet.getTileMappings()) {
-    const colorsInTile = new Set(wangId.colors.filter(c => c > 0));
+    const colorsInTile = new Set<number>();
+    for (const c of wangId.colors) {
+      if (c > 0) colorsInTile.add(c);
+    }
 
     for (const a of colorsInTile) {
       for (const b of colorsInTile) {
@@ -0,0 +1,27 @@
+/**
+ * Pack an (x, y) grid coordinate into a single integer key.
+ *
+ * Terrain painting and flood fill track visited/affected cells in sets.
+ * Hashing a small integer is much cheaper than building and hashing an
+ * "x,y" string per lookup, and packed keys avoid the per-cell string
+ * allocations entirely. Coordinates are biased by 2^15 so negative
+ * values still pack into a well-formed 32-bit integer.
+ */
+
+const BIAS = 1 << 15; // supports coordinates in [-32768, 32767]
+const SHIFT = 16;
+
+/** Pack (x, y) into a single integer key */
+export function packCoord(x: number, y: number): number {
+  return (x + BIAS) | ((y + BIAS) << SHIFT);
+}
+
+/** Extract x from a packed coordinate key */
+export function unpackX(key: number): number {
+  return (key & 0xffff) - BIAS;
+}
+
+/** Extract y from a packed coordinate key */
+export function unpackY(key: number): number {
+  return (key >>> SHIFT) - BIAS;
+}
@@ -1,5 +1,7 @@
 import type { AutotileMap } from './autotile-map.js';
+import { packCoord, unpackX, unpackY } from './coord-key.js';
 import { insertIntermediates, recomputeTiles } from './terrain-painter.js';
+import { NEIGHBOR_OFFSETS } from './wang-id.js';
 import type { WangSet } from './wang-set.js';
 
 /** 4-directional offsets for flood fill connectivity */
@@ -28,15 +30,16 @@ export function floodFillTerrain(
 
   // 1. BFS to find all connected cells with oldColor (4-directional)
   const filled: Array<[number, number]> = [];
-  const filledKeys = new Set<string>();
-  const visited = new Set<string>();
-  const startKey = `${startX},${startY}`;
-  const queue: [number, number][] = [[startX, startY]];
+  const filledKeys = new Set<number>();
+  const visited = new Set<number>();
+  const startKey = packCoord(startX, startY);
+  const queue: number[] = [startKey];
   visited.add(startKey);
   filledKeys.add(startKey);
 
-  while (queue.length > 0) {
-    const [cx, cy] = queue.shift()!;
+  for (let head = 0; head < queue.length; head++) {
+    const cx = unpackX(queue[head]);
+    const cy = unpackY(queue[head]);
     filled.push([cx, cy]);
 
     for (const [dx, dy] of FOUR_DIRECTIONS) {
@@ -44,13 +47,13 @@ export function floodFillTerrain(
       const ny = cy + dy;
       if (!map.inBounds(nx, ny)) continue;
 
-      const key = `${nx},${ny}`;
+      const key = packCoord(nx, ny);
       if (visited.has(key)) continue;
       visited.add(key);
 
       if (map.colorAt(nx, ny) === oldColor) {
         filledKeys.add(key);
-        queue.push([nx, ny]);
+        queue.push(key);
       }
     }
   }
@@ -60,24 +63,28 @@ export function floodFillTerrain(
     map.setColorAt(fx, fy, newColor);
   }
 
-  // 3. Find boundary cells (filled cells adjacent to non-filled cells)
-  const boundary = filled.filter(([fx, fy]) =>
-    FOUR_DIRECTIONS.some(([dx, dy]) => {
+  // 3. Find perimeter cells (filled cells with any of their 8 neighbors
+  // outside the filled region). Interior cells can't touch other colors, so
+  // only the perimeter — O(√n) of the region — participates in seeding.
+  const perimeter = filled.filter(([fx, fy]) =>
+    NEIGHBOR_OFFSETS.some(([dx, dy]) => {
       const nx = fx + dx;
       const ny = fy + dy;
-      return !map.inBounds(nx, ny) || !filledKeys.has(`${nx},${ny}`);
+      return !map.inBounds(nx, ny) || !filledKeys.has(packCoord(nx, ny));
     })
   );
 
-  // 4. Insert intermediates from boundary cells outward
-  const seedPositions = boundary.length > 0 ? boundary : filled;
-  const colorChanged = insertIntermediates(map, wangSet, seedPositions);
+  // 4. Insert intermediates from the perimeter outward
+  const seedPositions = perimeter.length > 0 ? perimeter : filled;
+  const { affected } = insertIntermediates(map, wangSet, seedPositions);
 
-  // Also include all filled cells as changed (even interior ones)
-  for (const [fx, fy] of filled) {
-    colorChanged.add(`${fx},${fy}`);
+  // Also recompute all filled cells. Interior cells need no dilation: every
+  // neighbor of an 8-neighbor-interior cell is itself filled, and the
+  // perimeter's ring was already collected by the BFS.
+  for (const key of filledKeys) {
+    affected.add(key);
   }
 
   // 5. Recompute tiles for affected region (centered on start for sort order)
-  return recomputeTiles(map, wangSet, colorChanged, startX, startY);
+  return recomputeTiles(map, wangSet, affected, startX, startY);
 }
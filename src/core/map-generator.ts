@@ -248,8 +248,10 @@ function smoothBorders(map: SimpleAutotileMap, wangSet: WangSet): void {
           if (!map.inBounds(nx, ny)) continue;
           const nc = map.colorAt(nx, ny);
           if (nc === 0) continue;
-          if (wangSet.colorDistance(myColor, nc) > 1) {
-            map.setColorAt(nx, ny, wangSet.nextHopColor(myColor, nc));
+          // Single next-hop lookup: returns nc itself unless distance > 1
+          const hop = wangSet.nextHopColor(myColor, nc);
+          if (hop !== nc) {
+            map.setColorAt(nx, ny, hop);
             changed = true;
           }
         }
@@ -1,7 +1,7 @@
 import type { AutotileMap } from './autotile-map.js';
 import type { Cell } from './cell.js';
 import { RandomPicker } from './random-picker.js';
-import { WangId, NEIGHBOR_OFFSETS, isActiveIndex } from './wang-id.js';
+import { WangId, NEIGHBOR_OFFSETS, activeIndices } from './wang-id.js';
 import type { WangSet } from './wang-set.js';
 
 /**
@@ -14,7 +14,7 @@ export function wangIdFromSurroundings(
   y: number,
   wangSet: WangSet
 ): WangId {
-  const colors = [0, 0, 0, 0, 0, 0, 0, 0];
+  const colors = new Uint8Array(8);
 
   for (let index = 0; index < 8; index++) {
     const [dx, dy] = NEIGHBOR_OFFSETS[index];
@@ -43,25 +43,51 @@ export function wangIdFromSurroundings(
  * Uses soft-constraint penalty scoring based on color distance.
  * Exact matches get penalty 0; close matches get low penalty via color distance.
  * Unreachable colors (distance < 0) are rejected.
+ *
+ * Scans the flat SoA variant index (colors + pre-computed weights) rather
+ * than the variant object list — no per-candidate attribute chasing.
+ *
+ * The surviving candidate pool is memoized per desired WangId (large
+ * brushes and fills request the same configurations over and over), so
+ * repeat lookups reduce to one map hit plus a weighted-random pick.
  */
 export function findBestMatch(
   wangSet: WangSet,
   desired: WangId,
   type: 'corner' | 'edge' | 'mixed'
 ): Cell | undefined {
+  const { colors, weights, cells, matchCache } = wangSet.variantIndex();
+  const cacheKey = type + '|' + desired.toKey();
+  const cachedPool = matchCache.get(cacheKey);
+  if (cachedPool) return cachedPool.pick();
+
+  const count = cells.length;
+  const desiredColors = desired.colors;
+  const { table: dist, stride } = wangSet.distanceTable();
+  const active = activeIndices(type);
   let lowestPenalty = Infinity;
   const candidates = new RandomPicker<Cell>();
 
-  for (const { wangId, cell } of wangSet.allVariants()) {
+  // With no active constraints every variant matches at penalty 0 — skip scoring entirely
+  let hasConstraint = false;
+  for (const i of active) {
+    if (desiredColors[i] !== 0) {
+      hasConstraint = true;
+      break;
+    }
+  }
+
+  for (let v = 0; v < count; v++) {
+    const base = v * 8;
     let totalPenalty = 0;
     let valid = true;
 
-    for (let i = 0; i < 8; i++) {
-      if (!isActiveIndex(i, type)) continue;
-      const desiredColor = desired.indexColor(i);
-      const candidateColor = wangId.indexColor(i);
+    for (let a = 0; hasConstraint && a < active.length; a++) {
+      const i = active[a];
+      const desiredColor = desiredColors[i];
 
       if (desiredColor === 0) continue; // No constraint on this corner
+      const candidateColor = colors[base + i];
       if (candidateColor === 0) {
         // Candidate has no terrain assigned for a corner where we need one.
         // Reject — tiles with unspecified corners shouldn't fill concrete terrain.
@@ -70,12 +96,21 @@ export function findBestMatch(
       }
       if (desiredColor === candidateColor) continue;
 
-      const distance = wangSet.colorDistance(desiredColor, candidateColor);
+      // Inlined colorDistance(): both colors are known non-zero and unequal here
+      const distance =
+        desiredColor < stride && candidateColor < stride
+          ? dist[desiredColor * stride + candidateColor]
+          : -1;
       if (distance < 0) {
         valid = false;
         break;
       }
       totalPenalty += distance;
+      if (totalPenalty > lowestPenalty) {
+        // Already worse than the best full score — can't win or tie, stop scoring
+        valid = false;
+        break;
+      }
     }
 
     if (!valid) continue;
@@ -86,10 +121,10 @@ export function findBestMatch(
     }
 
     if (totalPenalty === lowestPenalty) {
-      const probability = wangSet.wangIdProbability(wangId) * wangSet.tileProbability(cell.tilesetIndex, cell.tileId);
-      candidates.add(cell, probability);
+      candidates.add(cells[v], weights[v]);
     }
   }
 
+  matchCache.set(cacheKey, candidates);
   return candidates.pick();
 }
@@ -13,11 +13,16 @@ export class RandomPicker<T> {
     if (this.items.length === 0) return undefined;
     if (this.items.length === 1) return this.items[0].value;
 
+    // Binary search for the first item whose cumulative weight reaches r
     const r = Math.random() * this.total;
-    for (const item of this.items) {
-      if (r <= item.cumulativeWeight) return item.value;
+    let lo = 0;
+    let hi = this.items.length - 1;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.items[mid].cumulativeWeight < r) lo = mid + 1;
+      else hi = mid;
     }
-    return this.items[this.items.length - 1].value;
+    return this.items[lo].value;
   }
 
   isEmpty(): boolean {
@@ -1,15 +1,10 @@
 import type { AutotileMap } from './autotile-map.js';
-import { EMPTY_CELL } from './cell.js';
+import { type Cell, EMPTY_CELL } from './cell.js';
+import { packCoord, unpackX, unpackY } from './coord-key.js';
 import { findBestMatch } from './matching.js';
-import { WangId, NEIGHBOR_OFFSETS } from './wang-id.js';
+import { WangId, NEIGHBOR_OFFSETS, NINE_OFFSETS } from './wang-id.js';
 import type { WangSet } from './wang-set.js';
 
-/** Parse a "x,y" coordinate key into [x, y]. */
-function parseCoordKey(key: string): [number, number] {
-  const comma = key.indexOf(',');
-  return [+key.slice(0, comma), +key.slice(comma + 1)];
-}
-
 /**
  * Paint a terrain color at (x, y) and update all affected tiles.
  * Returns the list of (x, y) positions that were updated.
@@ -32,40 +27,73 @@ export function applyTerrainPaint(
   // Erase: clear the cell and recompute neighbors only
   if (color === 0) {
     map.setCellAt(x, y, EMPTY_CELL);
-    const colorChanged = new Set<string>([`${x},${y}`]);
-    return recomputeTiles(map, wangSet, colorChanged, x, y);
+    const affected = new Set<number>();
+    for (const [dx, dy] of NINE_OFFSETS) {
+      if (map.inBounds(x + dx, y + dy)) {
+        affected.add(packCoord(x + dx, y + dy));
+      }
+    }
+    return recomputeTiles(map, wangSet, affected, x, y);
   }
 
   // 2. Auto-insert intermediates from the single painted cell
-  const colorChanged = insertIntermediates(map, wangSet, [[x, y]]);
+  const { affected } = insertIntermediates(map, wangSet, [[x, y]]);
 
-  // 3. Expand, sort, recompute
-  return recomputeTiles(map, wangSet, colorChanged, x, y);
+  // 3. Sort and recompute the affected region
+  return recomputeTiles(map, wangSet, affected, x, y);
+}
+
+/** Result of insertIntermediates: both sets hold packed coordinate keys. */
+export interface IntermediateResult {
+  /** Positions whose painted color changed (including the seeds) */
+  colorChanged: Set<number>;
+  /** colorChanged plus its in-bounds ±1 ring — the region whose tiles need recomputing */
+  affected: Set<number>;
 }
 
 /**
  * BFS outward from seed positions to insert intermediate colors where
- * color distance > 1. Returns the set of all positions whose color changed
- * (including the seeds themselves).
+ * color distance > 1. The BFS already visits every neighbor of every
+ * changed cell, so the ±1 "affected" ring for tile recomputation is
+ * collected in the same traversal instead of a second dilation pass.
  */
 export function insertIntermediates(
   map: AutotileMap,
   wangSet: WangSet,
   seedPositions: Array<[number, number]>
-): Set<string> {
-  const colorChanged = new Set<string>();
-  const queue: [number, number][] = [];
-  const visited = new Set<string>();
+): IntermediateResult {
+  const colorChanged = new Set<number>();
+  const affected = new Set<number>();
+
+  // All transitions direct: the BFS can never insert an intermediate,
+  // so only the seeds and their ±1 ring are affected.
+  if (wangSet.maxColorDistance <= 1) {
+    for (const [sx, sy] of seedPositions) {
+      colorChanged.add(packCoord(sx, sy));
+      affected.add(packCoord(sx, sy));
+      for (const [dx, dy] of NEIGHBOR_OFFSETS) {
+        if (map.inBounds(sx + dx, sy + dy)) {
+          affected.add(packCoord(sx + dx, sy + dy));
+        }
+      }
+    }
+    return { colorChanged, affected };
+  }
+
+  const queue: number[] = [];
+  const visited = new Set<number>();
 
   for (const [sx, sy] of seedPositions) {
-    const key = `${sx},${sy}`;
+    const key = packCoord(sx, sy);
     colorChanged.add(key);
+    affected.add(key);
     visited.add(key);
-    queue.push([sx, sy]);
+    queue.push(key);
   }
 
-  while (queue.length > 0) {
-    const [cx, cy] = queue.shift()!;
+  for (let head = 0; head < queue.length; head++) {
+    const cx = unpackX(queue[head]);
+    const cy = unpackY(queue[head]);
     const myColor = map.colorAt(cx, cy);
 
     for (const [dx, dy] of NEIGHBOR_OFFSETS) {
@@ -73,70 +101,85 @@ export function insertIntermediates(
       const ny = cy + dy;
       if (!map.inBounds(nx, ny)) continue;
 
-      const key = `${nx},${ny}`;
+      const key = packCoord(nx, ny);
+      affected.add(key);
       if (visited.has(key)) continue;
 
       const neighborColor = map.colorAt(nx, ny);
       if (neighborColor === 0) continue;
 
-      const dist = wangSet.colorDistance(myColor, neighborColor);
-      if (dist > 1) {
-        // Need intermediate: change neighbor to the next hop from my color toward theirs
-        const intermediate = wangSet.nextHopColor(myColor, neighborColor);
+      // nextHopColor() returns the neighbor's own color when the transition is
+      // direct (distance <= 1) or unreachable, so a single table lookup both
+      // detects the gap and names the intermediate.
+      const intermediate = wangSet.nextHopColor(myColor, neighborColor);
+      if (intermediate !== neighborColor) {
         map.setColorAt(nx, ny, intermediate);
         colorChanged.add(key);
         visited.add(key);
-        queue.push([nx, ny]);
+        queue.push(key);
       }
     }
   }
 
-  return colorChanged;
+  return { colorChanged, affected };
 }
 
 /**
- * Expand affected region by ±1 ring, sort center-outward, recompute tiles.
+ * Sort the affected region center-outward and recompute its tiles.
+ * `affectedSet` must already include the ±1 ring around changed cells
+ * (insertIntermediates collects it during the BFS).
  * Returns the list of affected positions.
  */
 export function recomputeTiles(
   map: AutotileMap,
   wangSet: WangSet,
-  colorChanged: Set<string>,
+  affectedSet: Set<number>,
   centerX: number,
   centerY: number
 ): Array<[number, number]> {
-  // Expand affected region: all color-changed cells + ±1 ring for tile corner propagation
-  const affectedSet = new Set<string>();
-  for (const key of colorChanged) {
-    const [cx, cy] = parseCoordKey(key);
-    for (let dy = -1; dy <= 1; dy++) {
-      for (let dx = -1; dx <= 1; dx++) {
-        const nx = cx + dx;
-        const ny = cy + dy;
-        if (map.inBounds(nx, ny)) {
-          affectedSet.add(`${nx},${ny}`);
-        }
-      }
-    }
-  }
+  // Sort affected positions center-outward (Manhattan distance from center).
+  // The distance is computed once per position, not per comparison.
+  const decorated = [...affectedSet].map(k => {
+    const x = unpackX(k);
+    const y = unpackY(k);
+    return { x, y, d: Math.abs(x - centerX) + Math.abs(y - centerY) };
+  });
+  decorated.sort((a, b) => a.d - b.d);
+  const affected: Array<[number, number]> = decorated.map(p => [p.x, p.y]);
 
-  // Sort affected positions center-outward (Manhattan distance from center)
-  const affected: Array<[number, number]> = [...affectedSet].map(parseCoordKey);
-  affected.sort(
-    (a, b) =>
-      (Math.abs(a[0] - centerX) + Math.abs(a[1] - centerY)) -
-      (Math.abs(b[0] - centerX) + Math.abs(b[1] - centerY))
-  );
-
-  // Recompute tiles center-outward
-  for (const [ax, ay] of affected) {
-    const cellColor = map.colorAt(ax, ay);
+  // Recompute tiles center-outward, then commit the writes as one batch
+  applyCellWrites(map, resolveCells(map, wangSet, affected));
+  return affected;
+}
+
+/**
+ * Match tiles for a list of positions from their painted colors.
+ * This is a pure read phase — it mutates nothing, each position is
+ * independent of the others, and the result is applied afterwards via
+ * applyCellWrites(). (That independence is what would make the matcher
+ * partitionable across workers; a worker pool isn't worth the
+ * serialization cost for a synchronous in-browser brush, so the split
+ * stays single-threaded.)
+ *
+ * Colors don't change during a resolve pass, and neighboring cells read
+ * the same vertices repeatedly — lookups are cached across the pass.
+ */
+function resolveCells(
+  map: AutotileMap,
+  wangSet: WangSet,
+  positions: Array<[number, number]>
+): Array<[number, number, Cell]> {
+  const colorCache = new Map<number, number>();
+  const writes: Array<[number, number, Cell]> = [];
+
+  for (const [x, y] of positions) {
+    const cellColor = cachedColorAt(map, x, y, colorCache);
     if (cellColor === 0) continue;
 
-    const desired = desiredWangIdFromColors(map, ax, ay, wangSet.type);
+    const desired = desiredWangIdFromColors(map, x, y, wangSet.type, colorCache);
 
     // Skip replacement if existing tile already satisfies the desired WangId
-    const existing = map.cellAt(ax, ay);
+    const existing = map.cellAt(x, y);
     if (existing.tileId >= 0) {
       const existingWangId = wangSet.wangIdOfCell(existing);
       if (existingWangId && existingWangId.matches(desired, wangSet.type)) {
@@ -145,10 +188,10 @@ export function recomputeTiles(
     }
 
     const cell = findBestMatch(wangSet, desired, wangSet.type);
-    if (cell) map.setCellAt(ax, ay, cell);
+    if (cell) writes.push([x, y, cell]);
   }
 
-  return affected;
+  return writes;
 }
 
 /**
@@ -157,17 +200,37 @@ export function recomputeTiles(
  * since saved colors are already correct.
  */
 export function resolveAllTiles(map: AutotileMap, wangSet: WangSet): void {
+  const positions: Array<[number, number]> = [];
   for (let y = 0; y < map.height; y++) {
     for (let x = 0; x < map.width; x++) {
-      if (map.colorAt(x, y) === 0) continue;
+      positions.push([x, y]);
+    }
+  }
+  applyCellWrites(map, resolveCells(map, wangSet, positions));
+}
 
-      const desired = desiredWangIdFromColors(map, x, y, wangSet.type);
-      const cell = findBestMatch(wangSet, desired, wangSet.type);
-      if (cell) map.setCellAt(x, y, cell);
+/** Commit resolved cells in one batch when the map supports it */
+function applyCellWrites(map: AutotileMap, writes: Array<[number, number, Cell]>): void {
+  if (map.setCells) {
+    map.setCells(writes);
+  } else {
+    for (const [x, y, cell] of writes) {
+      map.setCellAt(x, y, cell);
     }
   }
 }
 
+/** Painted-color lookup memoized per resolve pass (colors are fixed while tiles recompute) */
+function cachedColorAt(map: AutotileMap, x: number, y: number, cache: Map<number, number>): number {
+  const key = packCoord(x, y);
+  let color = cache.get(key);
+  if (color === undefined) {
+    color = map.colorAt(x, y);
+    cache.set(key, color);
+  }
+  return color;
+}
+
 /** Corner vertex mapping: [wangIndex, dx, dy] */
 const CORNER_VERTICES: ReadonlyArray<[number, number, number]> = [
   [7, 0, 0],   // TL = self
@@ -193,16 +256,17 @@ function desiredWangIdFromColors(
   map: AutotileMap,
   x: number,
   y: number,
-  type: 'corner' | 'edge' | 'mixed'
+  type: 'corner' | 'edge' | 'mixed',
+  colorCache: Map<number, number>
 ): WangId {
-  const colors = [0, 0, 0, 0, 0, 0, 0, 0];
-  const selfColor = map.colorAt(x, y);
+  const colors = new Uint8Array(8);
+  const selfColor = cachedColorAt(map, x, y, colorCache);
 
   if (type === 'corner') {
     for (const [index, dx, dy] of CORNER_VERTICES) {
       const nx = x + dx;
       const ny = y + dy;
-      const c = map.inBounds(nx, ny) ? map.colorAt(nx, ny) : 0;
+      const c = map.inBounds(nx, ny) ? cachedColorAt(map, nx, ny, colorCache) : 0;
       colors[index] = c === 0 ? selfColor : c;
     }
   } else {
@@ -213,7 +277,7 @@ function desiredWangIdFromColors(
       const [dx, dy] = NEIGHBOR_OFFSETS[i];
       const nx = x + dx;
       const ny = y + dy;
-      const c = map.inBounds(nx, ny) ? map.colorAt(nx, ny) : 0;
+      const c = map.inBounds(nx, ny) ? cachedColorAt(map, nx, ny, colorCache) : 0;
       colors[i] = c === 0 ? selfColor : c;
     }
   }
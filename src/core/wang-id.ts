@@ -24,14 +24,30 @@ export const NEIGHBOR_OFFSETS: ReadonlyArray<[dx: number, dy: number]> = [
   [-1, -1], // 7: TopLeft
 ];
 
-export class WangId {
-  readonly colors: number[];
+/** All 9 offsets of a 3×3 neighborhood (center first), for dilation passes */
+export const NINE_OFFSETS: ReadonlyArray<[dx: number, dy: number]> = [
+  [0, 0],
+  ...NEIGHBOR_OFFSETS,
+];
 
-  constructor(colors?: number[]) {
-    this.colors = colors ? [...colors] : [0, 0, 0, 0, 0, 0, 0, 0];
-    if (this.colors.length !== WANG_INDEX_COUNT) {
-      throw new Error(`WangId requires exactly ${WANG_INDEX_COUNT} colors, got ${this.colors.length}`);
+export class WangId {
+  /** One byte per wang index. Treated as immutable — never written after construction. */
+  readonly colors: Uint8Array;
+  /** Lazily cached toKey() result (valid because WangIds are immutable) */
+  private cachedKey?: string;
+
+  constructor(colors?: ArrayLike<number>) {
+    if (colors && colors.length !== WANG_INDEX_COUNT) {
+      throw new Error(`WangId requires exactly ${WANG_INDEX_COUNT} colors, got ${colors.length}`);
     }
+    // A Uint8Array argument is adopted without copying — WangIds are immutable,
+    // so builders can fill a fresh buffer and hand it over directly.
+    this.colors =
+      colors instanceof Uint8Array
+        ? colors
+        : colors
+          ? Uint8Array.from(colors)
+          : new Uint8Array(WANG_INDEX_COUNT);
   }
 
   /** Get color at index 0-7 */
@@ -41,7 +57,7 @@ export class WangId {
 
   /** Return new WangId with color set at index */
   withIndexColor(index: number, color: number): WangId {
-    const newColors = [...this.colors];
+    const newColors = this.colors.slice();
     newColors[index] = color;
     return new WangId(newColors);
   }
@@ -55,7 +71,7 @@ export class WangId {
   rotated(n: number): WangId {
     const r = ((n % 4) + 4) % 4;
     if (r === 0) return new WangId(this.colors);
-    const newColors = new Array(WANG_INDEX_COUNT);
+    const newColors = new Uint8Array(WANG_INDEX_COUNT);
     for (let i = 0; i < WANG_INDEX_COUNT; i++) {
       const newIndex = (i + r * 2) % WANG_INDEX_COUNT;
       newColors[newIndex] = this.colors[i];
@@ -66,13 +82,13 @@ export class WangId {
   /** Flip horizontally (left-right). Swap map: {0:0, 1:7, 2:6, 3:5, 4:4, 5:3, 6:2, 7:1} */
   flippedHorizontally(): WangId {
     const c = this.colors;
-    return new WangId([c[0], c[7], c[6], c[5], c[4], c[3], c[2], c[1]]);
+    return new WangId(Uint8Array.of(c[0], c[7], c[6], c[5], c[4], c[3], c[2], c[1]));
   }
 
   /** Flip vertically (top-bottom). Swap map: {0:4, 1:3, 2:2, 3:1, 4:0, 5:7, 6:6, 7:5} */
   flippedVertically(): WangId {
     const c = this.colors;
-    return new WangId([c[4], c[3], c[2], c[1], c[0], c[7], c[6], c[5]]);
+    return new WangId(Uint8Array.of(c[4], c[3], c[2], c[1], c[0], c[7], c[6], c[5]));
   }
 
   /** Check if this WangId matches another, considering only indices where BOTH have non-zero values */
@@ -114,9 +130,9 @@ export class WangId {
     return true;
   }
 
-  /** Create a string key for hashing/dedup */
+  /** Create a string key for hashing/dedup. Computed once and cached. */
   toKey(): string {
-    return this.colors.join(',');
+    return (this.cachedKey ??= this.colors.join(','));
   }
 
   static allCorners(color: number): WangId {
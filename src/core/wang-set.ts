@@ -1,4 +1,5 @@
 import { type Cell, cellSpriteKey } from './cell.js';
+import type { RandomPicker } from './random-picker.js';
 import type { WangColor } from './wang-color.js';
 import { WangId } from './wang-id.js';
 
@@ -10,6 +11,18 @@ export interface WangVariant {
   cell: Cell;
 }
 
+/** Structure-of-arrays view over all variants, used by the matcher hot loop */
+export interface VariantIndex {
+  /** Variant WangId colors flattened to [variant * 8 + wangIndex] */
+  colors: Uint8Array;
+  /** Pre-computed selection weight per variant (color probability product × tile probability) */
+  weights: Float64Array;
+  /** Cell per variant, in the same order as the flattened colors */
+  cells: Cell[];
+  /** Memoized candidate pools keyed by "type|desiredKey" (populated by findBestMatch) */
+  matchCache: Map<string, RandomPicker<Cell>>;
+}
+
 export class WangSet {
   name: string;
   type: WangSetType;
@@ -22,10 +35,14 @@ export class WangSet {
   private variants: WangVariant[] = [];
   /** Reverse lookup: cellSpriteKey(cell) → variant WangId */
   private cellWangIds: Map<string, WangId> = new Map();
-  /** Color distance matrix [colorA][colorB]. -1 = no path. */
-  private distanceMatrix: number[][] = [];
-  /** Next-hop matrix [from][to] = first intermediate color on shortest path */
-  private nextHopMatrix: number[][] = [];
+  /** Lazily built SoA index over variants (see variantIndex()) */
+  private cachedVariantIndex?: VariantIndex;
+  /** Color distance matrix flattened to [colorA * distStride + colorB]. -1 = no path. */
+  private distTable: Int16Array = new Int16Array(0);
+  private distStride = 0;
+  /** Next-hop matrix flattened to [from * hopStride + to] = first intermediate color on shortest path */
+  private nextHopTable: Int16Array = new Int16Array(0);
+  private hopStride = 0;
   /** Cached max finite distance in the distance matrix */
   private cachedMaxDistance = -1;
   /** Representative tile for UI */
@@ -84,12 +101,31 @@ export class WangSet {
   /** Set the variants (called by variant-generator) */
   setVariants(variants: WangVariant[]): void {
     this.variants = variants;
+    this.cachedVariantIndex = undefined;
     this.cellWangIds = new Map();
     for (const { wangId, cell } of variants) {
       this.cellWangIds.set(cellSpriteKey(cell), wangId);
     }
   }
 
+  /** Get the SoA variant index for the matcher. Built lazily; invalidated by setVariants(). */
+  variantIndex(): VariantIndex {
+    if (!this.cachedVariantIndex) {
+      const count = this.variants.length;
+      const colors = new Uint8Array(count * 8);
+      const weights = new Float64Array(count);
+      const cells: Cell[] = new Array(count);
+      for (let v = 0; v < count; v++) {
+        const { wangId, cell } = this.variants[v];
+        colors.set(wangId.colors, v * 8);
+        weights[v] = this.wangIdProbability(wangId) * this.tileProbability(cell.tilesetIndex, cell.tileId);
+        cells[v] = cell;
+      }
+      this.cachedVariantIndex = { colors, weights, cells, matchCache: new Map() };
+    }
+    return this.cachedVariantIndex;
+  }
+
   /** Get the WangId for a placed cell (including flip flags), via the variant lookup. */
   wangIdOfCell(cell: Cell): WangId | undefined {
     return this.cellWangIds.get(cellSpriteKey(cell));
@@ -99,19 +135,26 @@ export class WangSet {
   colorDistance(colorA: number, colorB: number): number {
     if (colorA === colorB) return 0;
     if (colorA <= 0 || colorB <= 0) return 0;
-    if (colorA >= this.distanceMatrix.length || colorB >= this.distanceMatrix.length) return -1;
-    return this.distanceMatrix[colorA][colorB];
+    if (colorA >= this.distStride || colorB >= this.distStride) return -1;
+    return this.distTable[colorA * this.distStride + colorB];
   }
 
-  /** Set the distance matrix (called by color-distance) */
+  /** Get the flattened distance table + stride for direct indexing in hot loops */
+  distanceTable(): { table: Int16Array; stride: number } {
+    return { table: this.distTable, stride: this.distStride };
+  }
+
+  /** Set the distance matrix (called by color-distance). Flattened to a typed array for O(1) lookups. */
   setDistanceMatrix(matrix: number[][]): void {
-    this.distanceMatrix = matrix;
+    this.distStride = matrix.length;
+    this.distTable = flattenMatrix(matrix);
     this.cachedMaxDistance = -1; // invalidate cache
   }
 
-  /** Set the next-hop matrix (called by color-distance) */
+  /** Set the next-hop matrix (called by color-distance). Flattened to a typed array for O(1) lookups. */
   setNextHopMatrix(matrix: number[][]): void {
-    this.nextHopMatrix = matrix;
+    this.hopStride = matrix.length;
+    this.nextHopTable = flattenMatrix(matrix);
   }
 
   /** Get the first intermediate color on the shortest path from `from` to `to`.
@@ -119,8 +162,8 @@ export class WangSet {
   nextHopColor(from: number, to: number): number {
     if (from === to) return from;
     if (from <= 0 || to <= 0) return to;
-    if (from >= this.nextHopMatrix.length || to >= this.nextHopMatrix.length) return to;
-    const hop = this.nextHopMatrix[from][to];
+    if (from >= this.hopStride || to >= this.hopStride) return to;
+    const hop = this.nextHopTable[from * this.hopStride + to];
     return hop < 0 ? to : hop;
   }
 
@@ -128,12 +171,8 @@ export class WangSet {
   get maxColorDistance(): number {
     if (this.cachedMaxDistance >= 0) return this.cachedMaxDistance;
     let max = 0;
-    for (let i = 1; i < this.distanceMatrix.length; i++) {
-      for (let j = 1; j < this.distanceMatrix.length; j++) {
-        if (this.distanceMatrix[i][j] > max) {
-          max = this.distanceMatrix[i][j];
-        }
-      }
+    for (let i = 0; i < this.distTable.length; i++) {
+      if (this.distTable[i] > max) max = this.distTable[i];
     }
     this.cachedMaxDistance = max;
     return max;
@@ -162,3 +201,13 @@ export class WangSet {
     return this.colors[colorId - 1];
   }
 }
+
+/** Flatten an n×n matrix into a typed array indexed as [row * n + col] */
+function flattenMatrix(matrix: number[][]): Int16Array {
+  const n = matrix.length;
+  const flat = new Int16Array(n * n);
+  for (let i = 0; i < n; i++) {
+    flat.set(matrix[i], i * n);
+  }
+  return flat;
+}
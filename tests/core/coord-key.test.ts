@@ -0,0 +1,34 @@
+import { describe, it, expect } from 'vitest';
+import { packCoord, unpackX, unpackY } from '../../src/core/coord-key.js';
+
+describe('packCoord', () => {
+  it('round-trips positive coordinates', () => {
+    const key = packCoord(12, 34);
+    expect(unpackX(key)).toBe(12);
+    expect(unpackY(key)).toBe(34);
+  });
+
+  it('round-trips origin and negative coordinates', () => {
+    for (const [x, y] of [[0, 0], [-1, -1], [-5, 3], [7, -2]] as const) {
+      const key = packCoord(x, y);
+      expect(unpackX(key)).toBe(x);
+      expect(unpackY(key)).toBe(y);
+    }
+  });
+
+  it('produces distinct keys for distinct coordinates', () => {
+    const keys = new Set<number>();
+    for (let y = -2; y <= 2; y++) {
+      for (let x = -2; x <= 2; x++) {
+        keys.add(packCoord(x, y));
+      }
+    }
+    expect(keys.size).toBe(25);
+  });
+
+  it('round-trips large map coordinates', () => {
+    const key = packCoord(1023, 1023);
+    expect(unpackX(key)).toBe(1023);
+    expect(unpackY(key)).toBe(1023);
+  });
+});